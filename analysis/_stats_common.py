@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Shared data loading and Welch statistics for the statistical analysis scripts"""
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pac
+import numpy as np
+from scipy.stats import t as tdist
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# === DATA INTEGRATION FIX WITH CORRECT PATHS ===
+EXP_POST_PATH = '../data/raw/post_test_experimental.csv'
+MAIN_DATA_PATH = '../data/processed/analysis_ready.parquet'
+# Published copy, used when validate_data.py has not been run on this checkout
+MAIN_DATA_CSV_PATH = '../data/processed/analysis_ready.csv'
+CORRECTED_PATH = '../data/processed/analysis_ready_corrected.parquet'
+# Fixed category order, so group comparisons can use the int8 codes directly
+GROUP_DTYPE = pd.CategoricalDtype(['control', 'experimental'], ordered=False)
+EXPERIMENTAL_CODE = GROUP_DTYPE.categories.get_loc('experimental')
+ANALYSIS_DTYPES = {
+    'student_id': 'int32',
+    'group': GROUP_DTYPE,
+    'pre_test_score': 'float32',
+    'post_test_score': 'float32',
+    'score_improvement': 'float32',
+}
+ANALYSIS_COLS = list(ANALYSIS_DTYPES)
+EXP_POST_DTYPES = {'student_id': 'int32', 'istudent_id': 'int32', 'total_score': 'float32'}
+
+def analysis_ready_path():
+    """Path of the analysis_ready file to read: the Parquet output if present, else the CSV"""
+    return MAIN_DATA_PATH if os.path.exists(MAIN_DATA_PATH) else MAIN_DATA_CSV_PATH
+
+def read_analysis_csv(path):
+    """Read an analysis CSV with declared column types using PyArrow's threaded reader"""
+    # Arrow only converts CSV text to dictionaries with int32 indices;
+    # pandas still narrows the category codes to int8
+    column_types = {
+        'student_id': pa.int32(),
+        'group': pa.dictionary(pa.int32(), pa.string()),
+        'pre_test_score': pa.float32(),
+        'post_test_score': pa.float32(),
+        'score_improvement': pa.float32(),
+    }
+    table = pac.read_csv(
+        path,
+        read_options=pac.ReadOptions(use_threads=True),
+        convert_options=pac.ConvertOptions(include_columns=ANALYSIS_COLS, column_types=column_types),
+    )
+    df = table.to_pandas(self_destruct=True)
+    # Arrow orders categories by first appearance; pin them to GROUP_DTYPE
+    df['group'] = df['group'].astype(GROUP_DTYPE)
+    return df
+
+def read_analysis_ready():
+    """Read analysis_ready with the shared column types, from Parquet or the published CSV"""
+    path = analysis_ready_path()
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path, columns=ANALYSIS_COLS, engine='pyarrow')
+    else:
+        df = read_analysis_csv(path)
+    return df.astype(ANALYSIS_DTYPES)
+
+def load_corrected_df():
+    """Load the corrected dataset, rebuilding it only when its sources have changed"""
+    source_mtime = max(os.stat(path).st_mtime for path in (EXP_POST_PATH, analysis_ready_path()))
+    if os.path.exists(CORRECTED_PATH) and os.stat(CORRECTED_PATH).st_mtime >= source_mtime:
+        print(f"✅ Using cached corrected data: {CORRECTED_PATH}")
+        return pd.read_parquet(CORRECTED_PATH, columns=ANALYSIS_COLS, engine='pyarrow')
+
+    print("Fixing data integration...")
+
+    # Read the experimental post-test data from raw folder
+    exp_post = pd.read_csv(EXP_POST_PATH, usecols=lambda col: col in EXP_POST_DTYPES,
+                           dtype=EXP_POST_DTYPES, engine='c')
+
+    # Fix the column name typo (you mentioned you already did this manually, but keeping for safety)
+    exp_post = exp_post.rename(columns={'istudent_id': 'student_id'})
+
+    # Read the main dataset from processed folder
+    main_data = read_analysis_ready()
+
+    # Merge the experimental post-test scores
+    df = main_data.merge(
+        exp_post[['student_id', 'total_score']], 
+        on='student_id', 
+        how='left'
+    )
+
+    # Update post_test_score and score_improvement for experimental group
+    experimental_mask = df['group'].cat.codes.to_numpy() == EXPERIMENTAL_CODE
+    pre = df['pre_test_score'].to_numpy(dtype=float)
+    post = np.where(experimental_mask, df['total_score'].to_numpy(dtype=float),
+                    df['post_test_score'].to_numpy(dtype=float))
+    df['post_test_score'] = post
+    df['score_improvement'] = np.where(experimental_mask, post - pre,
+                                       df['score_improvement'].to_numpy(dtype=float))
+
+    # Drop the temporary total_score column
+    df = df.drop(columns='total_score')
+
+    print(f"✅ Data integration complete! Total records: {len(df)}")
+
+    # Save the corrected dataset to processed folder
+    df = df.astype(ANALYSIS_DTYPES)
+    df.to_parquet(CORRECTED_PATH, compression='snappy', engine='pyarrow', index=False)
+    print(f"✅ Saved corrected data to: {CORRECTED_PATH}")
+
+    return df
+
+def _moments_welford(a):
+    """Single-pass (Welford) size, mean and sample variance of a float64 array, skipping NaNs"""
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(a.size):
+        x = a[i]
+        if x != x:  # NaN
+            continue
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    # Match the NaN-aware NumPy reductions: no mean without data, no variance below n=2
+    if n == 0:
+        return n, np.nan, np.nan
+    if n < 2:
+        return n, mean, np.nan
+    return n, mean, m2 / (n - 1)
+
+def _moments_numpy(a):
+    """Size, mean and sample variance using NaN-aware NumPy reductions"""
+    return np.count_nonzero(~np.isnan(a)), np.nanmean(a), np.nanvar(a, ddof=1)
+
+# numba is optional: compile the single-pass kernel when it is available
+_moments = njit(cache=True)(_moments_welford) if njit is not None else _moments_numpy
+
+def moments(a):
+    """Return the size, mean and sample variance (ddof=1) of an array, ignoring NaNs"""
+    return _moments(np.ascontiguousarray(a, dtype=np.float64))
+
+def describe_groups(df):
+    """Print mean ± SD of each score column for both groups"""
+    score_cols = ['pre_test_score', 'post_test_score', 'score_improvement']
+    summary = df.groupby('group', observed=True)[score_cols].agg(['mean', 'std'])
+    for grp, label in (('control', 'Control Group (n=21)'), ('experimental', 'Experimental Group (n=20)')):
+        row = summary.loc[grp]
+        print(f"\n{label}:")
+        print(f"Pre-test:  {row[('pre_test_score', 'mean')]:.2f} ± {row[('pre_test_score', 'std')]:.2f}")
+        print(f"Post-test: {row[('post_test_score', 'mean')]:.2f} ± {row[('post_test_score', 'std')]:.2f}")
+        print(f"Improvement: {row[('score_improvement', 'mean')]:.2f} ± {row[('score_improvement', 'std')]:.2f}")
+    return summary
+
+def welch_test(exp, ctrl, alpha=0.05):
+    """Welch's t-test, Cohen's d and CI for the mean difference (exp - ctrl)"""
+    ne, m_e, s2e = moments(exp)
+    nc, m_c, s2c = moments(ctrl)
+
+    # Welch-Satterthwaite df, reusing each group's squared standard error
+    sem2_c, sem2_e = s2c/nc, s2e/ne
+    se  = np.sqrt(sem2_c + sem2_e)
+    dof = (sem2_c + sem2_e)**2 / (sem2_c**2/(nc-1) + sem2_e**2/(ne-1))
+    mean_diff = m_e - m_c
+    t = mean_diff / se
+    ci_half = tdist.ppf(1 - alpha/2, dof) * se
+
+    return {
+        't': t,
+        'p': 2 * tdist.sf(abs(t), dof),
+        'df': dof,
+        'se': se,
+        'mean_diff': mean_diff,
+        # Cohen's d (pooled SD)
+        'd': mean_diff / np.sqrt((s2c + s2e) / 2),
+        'ci': (mean_diff - ci_half, mean_diff + ci_half),
+    }
+
+def welch_results(post_ctrl, post_exp, imp_ctrl, imp_exp, alpha=0.05):
+    """Run the Welch comparison on post-test scores and on improvements"""
+    return {
+        'post': welch_test(post_exp, post_ctrl, alpha),
+        'improvement': welch_test(imp_exp, imp_ctrl, alpha),
+    }
@@ -1,38 +1,48 @@
 #!/usr/bin/env python3
+import sys
 import numpy as np
-import scipy.stats as stats
+import pandas as pd
+import matplotlib
+# Use the non-interactive Agg backend unless attached to a terminal
+matplotlib.use('Agg' if not sys.stdout.isatty() else matplotlib.get_backend())
 import matplotlib.pyplot as plt
 
-# Reading data from individual files
-group1 = np.loadtxt("group1.txt", skiprows=0)
-group2 = np.loadtxt("group2.txt", skiprows=0)
-
-## Transfering data to vertical Vector
+# Reading only the pre-test column (column 6) from individual files
 # Control Group
-g2pre = group2[:,6]
+g2pre = pd.read_csv("group2.txt", sep=r'\s+', header=None, usecols=[6],
+                    dtype=np.float32, engine='c').to_numpy().ravel()
 
 # Experimental Group
-g1pre = group1[:,6]
+g1pre = pd.read_csv("group1.txt", sep=r'\s+', header=None, usecols=[6],
+                    dtype=np.float32, engine='c').to_numpy().ravel()
+
+def npdf(x, mu, s):
+    """Normal PDF without scipy.stats' generic argument checking"""
+    z = (x - mu) / s
+    return np.exp(-0.5*z*z) / (s * np.sqrt(2*np.pi))
 
-## Fit a normal distribution to the data:
+## Fit a normal distribution to the data (closed-form MLE, same as stats.norm.fit):
 # Control Group
-g2mu, g2std = stats.norm.fit(g2pre)
+g2mu, g2std = g2pre.mean(), g2pre.std(ddof=0)
 
 # Experimental Group
-g1mu, g1std = stats.norm.fit(g1pre)
+g1mu, g1std = g1pre.mean(), g1pre.std(ddof=0)
 
 ## Plot the PDF
-# Control Group
+# Evaluate both groups on the shared grid in one broadcast pass:
+# column 0 is the Control Group (21 students), column 1 the Experimental Group (20)
 x = np.linspace(-10., 35., 100)
-p2 = stats.norm.pdf(x, g2mu, g2std)
-p2 = p2*21.
-plt.plot(x, p2, 'b', linewidth=2, label='Control Group')
+mus = np.array([g2mu, g1mu], dtype=np.float64)
+stds = np.array([g2std, g1std], dtype=np.float64)
+scales = np.array([21., 20.])
+p = npdf(x[:, None], mus, stds) * scales
+
+# Control Group
+plt.plot(x, p[:, 0], 'b', linewidth=2, label='Control Group')
 
 
 # Experiemental Group
-p1 = stats.norm.pdf(x, g1mu, g1std)
-p1 = p1*20.
-plt.plot(x, p1, 'r', linewidth=2, label='Experimental Group')
+plt.plot(x, p[:, 1], 'r', linewidth=2, label='Experimental Group')
 
 # Lable and Title for the Graph
 title = "Comparision" 
@@ -42,4 +52,6 @@ plt.ylabel("Fraction of students in Class")
 plt.title(subtitle, fontsize=10)
 plt.suptitle(title, fontsize=18)
 plt.legend(loc='best')
-plt.show()
\ No newline at end of file
+plt.savefig('pre_test_comparison.png', dpi=300, bbox_inches='tight')
+if sys.stdout.isatty():
+    plt.show()
\ No newline at end of file
@@ -1,14 +1,13 @@
 #!/usr/bin/env python3
 """Debug script to check data issues"""
 
-import pandas as pd
 import numpy as np
-from pathlib import Path
+
+from _stats_common import read_analysis_ready
 
 def check_data_issues():
     """Check for data problems"""
-    data_dir = Path('../data/processed')
-    analysis_df = pd.read_csv(data_dir / 'analysis_ready.csv')
+    analysis_df = read_analysis_ready()
     
     print("=== DATA QUALITY CHECK ===")
     print(f"Total records: {len(analysis_df)}")
@@ -1,28 +1,30 @@
 #!/usr/bin/env python3
 """Fix common data issues"""
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from _stats_common import read_analysis_ready
+
 def fix_data_issues():
     """Fix common data problems"""
     data_dir = Path('../data/processed')
     
-    # Load and clean analysis_ready.csv
-    analysis_df = pd.read_csv(data_dir / 'analysis_ready.csv')
+    # Load and clean analysis_ready
+    analysis_df = read_analysis_ready()
     
     print("Before cleaning:")
     print(f"Total records: {len(analysis_df)}")
     print(f"Missing post-test scores: {analysis_df['post_test_score'].isna().sum()}")
     
-    # Remove rows with missing critical data
-    analysis_df = analysis_df.dropna(subset=['pre_test_score', 'post_test_score'])
+    # Remove rows with missing or infinite critical data in a single pass
+    pre = analysis_df['pre_test_score'].to_numpy()
+    post = analysis_df['post_test_score'].to_numpy()
+    valid = np.isfinite(pre) & np.isfinite(post)
+    analysis_df = analysis_df.iloc[valid].copy()
     
-    # Fix infinite values in improvement
-    analysis_df['score_improvement'] = analysis_df['post_test_score'] - analysis_df['pre_test_score']
-    analysis_df = analysis_df.replace([np.inf, -np.inf], np.nan)
-    analysis_df = analysis_df.dropna(subset=['score_improvement'])
+    # Recompute improvement from the validated scores
+    analysis_df['score_improvement'] = post[valid] - pre[valid]
     
     print("\nAfter cleaning:")
     print(f"Total records: {len(analysis_df)}")
@@ -30,8 +32,9 @@ def fix_data_issues():
     print(f"Experimental group: {len(analysis_df[analysis_df['group'] == 'experimental'])}")
     
     # Save cleaned data
-    analysis_df.to_csv(data_dir / 'analysis_ready_cleaned.csv', index=False)
-    print(f"\nSaved cleaned data to: {data_dir / 'analysis_ready_cleaned.csv'}")
+    analysis_df.to_parquet(data_dir / 'analysis_ready_cleaned.parquet', compression='snappy',
+                           engine='pyarrow', index=False)
+    print(f"\nSaved cleaned data to: {data_dir / 'analysis_ready_cleaned.parquet'}")
     
     return analysis_df
 
@@ -4,28 +4,32 @@ Master script to reproduce all analyses and figures from the research paper.
 Run this to completely replicate the study results.
 """
 
+import concurrent.futures
 import subprocess
 import sys
 from pathlib import Path
 
-def run_script(script_name):
-    """Run a Python script and handle errors"""
-    print(f"\n▶ Running {script_name}...")
+def run_script(script_name, *args):
+    """Run a Python script with optional arguments and handle errors"""
+    # Buffer the report so concurrently running scripts don't interleave output
+    lines = [f"\n▶ Running {script_name}..."]
+    ok = True
     try:
-        result = subprocess.run([sys.executable, script_name], 
+        result = subprocess.run([sys.executable, script_name, *args], 
                               capture_output=True, text=True, cwd=Path(__file__).parent)
         if result.returncode == 0:
-            print(f"✅ {script_name} completed successfully")
+            lines.append(f"✅ {script_name} completed successfully")
             if result.stdout:
-                print(result.stdout)
+                lines.append(result.stdout)
         else:
-            print(f"❌ {script_name} failed with error:")
-            print(result.stderr)
-            return False
+            lines.append(f"❌ {script_name} failed with error:")
+            lines.append(result.stderr)
+            ok = False
     except Exception as e:
-        print(f"❌ Error running {script_name}: {e}")
-        return False
-    return True
+        lines.append(f"❌ Error running {script_name}: {e}")
+        ok = False
+    print("\n".join(lines))
+    return ok
 
 def main():
     print("=" * 60)
@@ -38,14 +42,15 @@ def main():
     
     # Run all analysis steps
     steps = [
-        "statistical_analysis.py",
-        "visualization.py"
+        ("statistical_analysis.py",),
+        ("visualization.py", "--final")
     ]
     
-    success_count = 0
-    for step in steps:
-        if run_script(step):
-            success_count += 1
+    # The steps have no data dependency on each other, so run them concurrently;
+    # subprocess.run releases the GIL while waiting, so threads are enough
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(steps)) as executor:
+        futures = [executor.submit(run_script, *step) for step in steps]
+        success_count = sum(future.result() for future in concurrent.futures.as_completed(futures))
     
     print("\n" + "=" * 60)
     print(f"ANALYSIS COMPLETE: {success_count}/{len(steps)} steps successful")
@@ -1,126 +1,66 @@
-import pandas as pd
-import numpy as np
-from scipy import stats
+import sys
+import matplotlib
+# Use the non-interactive Agg backend unless attached to a terminal
+matplotlib.use('Agg' if not sys.stdout.isatty() else matplotlib.get_backend())
 import matplotlib.pyplot as plt
-import seaborn as sns
-
-# === DATA INTEGRATION FIX WITH CORRECT PATHS ===
-print("Fixing data integration...")
-
-# Read the experimental post-test data from raw folder
-exp_post = pd.read_csv('../data/raw/post_test_experimental.csv')
-
-# Fix the column name typo (you mentioned you already did this manually, but keeping for safety)
-exp_post = exp_post.rename(columns={'istudent_id': 'student_id'})
-
-# Read the main dataset from processed folder
-main_data = pd.read_csv('../data/processed/analysis_ready.csv')
-
-# Merge the experimental post-test scores
-df = main_data.merge(
-    exp_post[['student_id', 'total_score']], 
-    on='student_id', 
-    how='left'
-)
-
-# Update post_test_score and score_improvement for experimental group
-experimental_mask = df['group'] == 'experimental'
-df.loc[experimental_mask, 'post_test_score'] = df.loc[experimental_mask, 'total_score']
-df.loc[experimental_mask, 'score_improvement'] = (
-    df.loc[experimental_mask, 'post_test_score'] - 
-    df.loc[experimental_mask, 'pre_test_score']
-)
-
-# Drop the temporary total_score column
-df = df.drop('total_score', axis=1)
+import numpy as np
 
-print(f"✅ Data integration complete! Total records: {len(df)}")
+from _stats_common import load_corrected_df, describe_groups, welch_results
 
-# Save the corrected dataset to processed folder
-df.to_csv('../data/processed/analysis_ready_corrected.csv', index=False)
-print("✅ Saved corrected data to: ../data/processed/analysis_ready_corrected.csv")
+df = load_corrected_df()
 
 # === CONTINUE WITH STATISTICAL ANALYSIS ===
-# Separate groups
-control = df[df['group'] == 'control']
-experimental = df[df['group'] == 'experimental']
+# Row positions of each group, computed once and reused for every column
+groups = df.groupby('group', observed=True).indices
+ctrl_pos, exp_pos = groups['control'], groups['experimental']
+post_scores = df['post_test_score'].to_numpy()
+improvements = df['score_improvement'].to_numpy()
 
 print("\n=== DESCRIPTIVE STATISTICS ===")
-print("\nControl Group (n=21):")
-print(f"Pre-test:  {control['pre_test_score'].mean():.2f} ± {control['pre_test_score'].std():.2f}")
-print(f"Post-test: {control['post_test_score'].mean():.2f} ± {control['post_test_score'].std():.2f}")
-print(f"Improvement: {control['score_improvement'].mean():.2f} ± {control['score_improvement'].std():.2f}")
-
-print("\nExperimental Group (n=20):")
-print(f"Pre-test:  {experimental['pre_test_score'].mean():.2f} ± {experimental['pre_test_score'].std():.2f}")
-print(f"Post-test: {experimental['post_test_score'].mean():.2f} ± {experimental['post_test_score'].std():.2f}")
-print(f"Improvement: {experimental['score_improvement'].mean():.2f} ± {experimental['score_improvement'].std():.2f}")
+describe_groups(df)
 
 print("\n=== INDEPENDENT T-TESTS ===")
-# Clean arrays (drop NaNs) for post-test scores and improvements
-post_ctrl = control['post_test_score'].astype(float).dropna()
-post_exp  = experimental['post_test_score'].astype(float).dropna()
-imp_ctrl  = control['score_improvement'].astype(float).dropna()
-imp_exp   = experimental['score_improvement'].astype(float).dropna()
+# Post-test scores and improvements per group (NaNs are ignored by the statistics)
+post_ctrl = post_scores[ctrl_pos]
+post_exp  = post_scores[exp_pos]
+imp_ctrl  = improvements[ctrl_pos]
+imp_exp   = improvements[exp_pos]
 
 # === Welch's t-tests (robust to unequal variances & sizes) ===
-# Post-test
-t_post, p_post = stats.ttest_ind(post_exp, post_ctrl, equal_var=False, nan_policy='omit')
-# Welch-Satterthwaite df for post-test
-s2c, s2e = post_ctrl.var(ddof=1), post_exp.var(ddof=1)
-nc, ne   = len(post_ctrl), len(post_exp)
-se_post  = np.sqrt(s2c/nc + s2e/ne)
-df_post  = (s2c/nc + s2e/ne)**2 / ((s2c**2)/(nc**2*(nc-1)) + (s2e**2)/(ne**2*(ne-1)))
-print(f"Post-test (Welch) t({df_post:.2f}) = {t_post:.3f}, p = {p_post:.4f}")
-
-# Improvements
-t_imp, p_imp = stats.ttest_ind(imp_exp, imp_ctrl, equal_var=False, nan_policy='omit')
-s2c_i, s2e_i = imp_ctrl.var(ddof=1), imp_exp.var(ddof=1)
-nc_i, ne_i   = len(imp_ctrl), len(imp_exp)
-se_imp       = np.sqrt(s2c_i/nc_i + s2e_i/ne_i)
-df_imp       = (s2c_i/nc_i + s2e_i/ne_i)**2 / ((s2c_i**2)/(nc_i**2*(nc_i-1)) + (s2e_i**2)/(ne_i**2*(ne_i-1)))
-print(f"Improvement (Welch) t({df_imp:.2f}) = {t_imp:.3f}, p = {p_imp:.4f}")
+results = welch_results(post_ctrl, post_exp, imp_ctrl, imp_exp)
+post, imp = results['post'], results['improvement']
+print(f"Post-test (Welch) t({post['df']:.2f}) = {post['t']:.3f}, p = {post['p']:.4f}")
+print(f"Improvement (Welch) t({imp['df']:.2f}) = {imp['t']:.3f}, p = {imp['p']:.4f}")
 
 print("\n=== EFFECT SIZES (Cohen's d) ===")
-# Cohen's d (pooled SD) using cleaned arrays
-pooled_post = np.sqrt((post_ctrl.var(ddof=1) + post_exp.var(ddof=1)) / 2)
-post_d = (post_exp.mean() - post_ctrl.mean()) / pooled_post
-pooled_imp = np.sqrt((imp_ctrl.var(ddof=1) + imp_exp.var(ddof=1)) / 2)
-imp_d  = (imp_exp.mean() - imp_ctrl.mean()) / pooled_imp
-print(f"Post-test effect size (d): {post_d:.3f}")
+imp_d = imp['d']
+print(f"Post-test effect size (d): {post['d']:.3f}")
 print(f"Improvement effect size (d): {imp_d:.3f}")
 
 print("\n=== CONFIDENCE INTERVALS (Welch) ===")
-alpha = 0.05
 # 95% CI for mean difference (exp - ctrl)
-from scipy.stats import t as tdist
-
-# Post-test CI
-md_post = post_exp.mean() - post_ctrl.mean()
-ci_half_post = tdist.ppf(1 - alpha/2, df_post) * se_post
-print(f"95% CI for post-test difference: ({md_post - ci_half_post:.3f}, {md_post + ci_half_post:.3f})")
-
-# Improvement CI
-md_imp = imp_exp.mean() - imp_ctrl.mean()
-ci_half_imp = tdist.ppf(1 - alpha/2, df_imp) * se_imp
-print(f"95% CI for improvement difference: ({md_imp - ci_half_imp:.3f}, {md_imp + ci_half_imp:.3f})")
+print(f"95% CI for post-test difference: ({post['ci'][0]:.3f}, {post['ci'][1]:.3f})")
+print(f"95% CI for improvement difference: ({imp['ci'][0]:.3f}, {imp['ci'][1]:.3f})")
 
 # Create summary visualization
 fig, axes = plt.subplots(1, 2, figsize=(12, 5))
 
-# Improvement comparison
-sns.boxplot(data=df, x='group', y='score_improvement', ax=axes[0])
-axes[0].set_title('Score Improvement by Group')
-axes[0].set_ylabel('Improvement (Post-test - Pre-test)')
-
-# Post-test scores comparison
-sns.boxplot(data=df, x='group', y='post_test_score', ax=axes[1])
-axes[1].set_title('Post-test Scores by Group')
-axes[1].set_ylabel('Post-test Score')
+# Improvement and post-test comparisons, drawn straight from the per-group arrays
+group_names = list(df['group'].cat.categories)
+for ax, values, title, ylabel in (
+        (axes[0], improvements, 'Score Improvement by Group', 'Improvement (Post-test - Pre-test)'),
+        (axes[1], post_scores, 'Post-test Scores by Group', 'Post-test Score')):
+    data = [values[groups[name]] for name in group_names]
+    ax.boxplot([d[~np.isnan(d)] for d in data])
+    ax.set_xticks(range(1, len(group_names) + 1), group_names)
+    ax.set_xlabel('group')
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
 
 plt.tight_layout()
 plt.savefig('statistical_comparison.png', dpi=300, bbox_inches='tight')
-plt.show()
+if sys.stdout.isatty():
+    plt.show()
 
 print("\n=== INTERPRETATION GUIDE ===")
 print("Cohen's d effect sizes:")
@@ -4,40 +4,90 @@ Visualization functions for the cartoon physics instruction study.
 Generates all figures used in the research paper.
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
 from pathlib import Path
 
+from _stats_common import read_analysis_ready
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Set style for publication-quality figures
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_palette("colorblind")
 
+# Publication-quality rcParams, applied in one update by setup_plotting()
+_RC = {
+    'figure.figsize': (10, 6),
+    'font.size': 12,
+    'axes.labelsize': 14,
+    'axes.titlesize': 16,
+    'xtick.labelsize': 12,
+    'ytick.labelsize': 12,
+}
+
 def setup_plotting():
-    """Configure matplotlib for publication quality"""
-    plt.rcParams['figure.figsize'] = (10, 6)
-    plt.rcParams['font.size'] = 12
-    plt.rcParams['axes.labelsize'] = 14
-    plt.rcParams['axes.titlesize'] = 16
-    plt.rcParams['xtick.labelsize'] = 12
-    plt.rcParams['ytick.labelsize'] = 12
+    """Configure matplotlib for publication quality (only the first call has an effect)"""
+    if not getattr(setup_plotting, '_done', False):
+        plt.rcParams.update(_RC)
+        setup_plotting._done = True
 
 def clean_data(series):
     """Remove NaN and infinite values from data"""
     return series.replace([np.inf, -np.inf], np.nan).dropna()
 
-def plot_pre_test_distributions(analysis_df, save_path=None):
-    """Plot pre-test score distributions for both groups"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+def _norm_fit_pdf(data, x):
+    """Fit a normal distribution (MLE, as stats.norm.fit) and evaluate its PDF on x"""
+    mu = data.mean()
+    s = np.sqrt(((data - mu)**2).sum() / len(data))
+    return mu, s, np.exp(-0.5*((x - mu)/s)**2) / (s * 2.5066282746310002)
+
+# numba is optional: compile the fused fit + PDF kernel when it is available
+if njit is not None:
+    _norm_fit_pdf = njit(cache=True)(_norm_fit_pdf)
+
+def _jitter_scatter(ax, groups, size, alpha):
+    """Overlay individual points at x = 0, 1, ... with random horizontal jitter"""
+    rng = np.random.default_rng(0)
+    for i, values in enumerate(groups):
+        ax.scatter(i + rng.uniform(-0.15, 0.15, len(values)), values,
+                   s=size**2, alpha=alpha, color='black', zorder=3)
+
+def _prepare_clean_groups(df, col):
+    """Split a column by group in one pass and clean each part"""
+    parts = dict(tuple(df.groupby('group', sort=False, observed=True)[col]))
+    return {group: clean_data(parts.get(group, pd.Series(dtype=float)))
+            for group in ['control', 'experimental']}
+
+def _finish_figure(fig, save_path, filename, show, final):
+    """Lay out, optionally save, then show or close a figure"""
+    fig.tight_layout()
+    
+    if save_path:
+        fig.savefig(save_path / filename, dpi=300 if final else 120)
+        print(f"Saved: {save_path / filename}")
+    
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+def _plot_pre(ax1, ax2, analysis_df):
+    """Draw the control and experimental pre-test histograms into ax1 and ax2"""
+    pre_groups = _prepare_clean_groups(analysis_df, 'pre_test_score')
     
     # Control group - with data cleaning
-    control_pre = clean_data(analysis_df[analysis_df['group'] == 'control']['pre_test_score'])
+    control_pre = pre_groups['control']
     if len(control_pre) > 0:
-        mu_control, std_control = stats.norm.fit(control_pre)
         x_control = np.linspace(control_pre.min(), control_pre.max(), 100)
-        p_control = stats.norm.pdf(x_control, mu_control, std_control) * len(control_pre)
+        mu_control, std_control, p_control = _norm_fit_pdf(control_pre.to_numpy(dtype=np.float64), x_control)
+        p_control = p_control * len(control_pre)
         
         ax1.hist(control_pre, bins=8, density=False, alpha=0.7, color='blue', label='Control')
         ax1.plot(x_control, p_control, 'b-', linewidth=2, label=f'Normal fit')
@@ -51,11 +101,11 @@ def plot_pre_test_distributions(analysis_df, save_path=None):
         ax1.set_title('Control Group (No Data)')
     
     # Experimental group - with data cleaning
-    experimental_pre = clean_data(analysis_df[analysis_df['group'] == 'experimental']['pre_test_score'])
+    experimental_pre = pre_groups['experimental']
     if len(experimental_pre) > 0:
-        mu_exp, std_exp = stats.norm.fit(experimental_pre)
         x_exp = np.linspace(experimental_pre.min(), experimental_pre.max(), 100)
-        p_exp = stats.norm.pdf(x_exp, mu_exp, std_exp) * len(experimental_pre)
+        mu_exp, std_exp, p_exp = _norm_fit_pdf(experimental_pre.to_numpy(dtype=np.float64), x_exp)
+        p_exp = p_exp * len(experimental_pre)
         
         ax2.hist(experimental_pre, bins=8, density=False, alpha=0.7, color='red', label='Experimental')
         ax2.plot(x_exp, p_exp, 'r-', linewidth=2, label=f'Normal fit')
@@ -67,97 +117,141 @@ def plot_pre_test_distributions(analysis_df, save_path=None):
     else:
         ax2.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax2.transAxes)
         ax2.set_title('Experimental Group (No Data)')
+
+def plot_pre_test_distributions(analysis_df, save_path=None, show=True, final=False):
+    """Plot pre-test score distributions for both groups"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    _plot_pre(ax1, ax2, analysis_df)
+    _finish_figure(fig, save_path, 'pre_test_distributions.png', show, final)
+
+def live_pre_test_distributions(analysis_df, bins=8):
+    """Draw the pre-test figure once and return (fig, update) for repeated redraws
+    
+    update(analysis_df) only re-renders the histogram bars, fit lines and titles
+    using blitting; axes, grid and legends are rasterized once. Axis limits are
+    fixed from the initial data.
+    """
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+    groups = _prepare_clean_groups(analysis_df, 'pre_test_score')
+    all_scores = np.concatenate([groups['control'].to_numpy(), groups['experimental'].to_numpy()])
+    
+    panels = []
+    for ax, group, color in zip(axes, ['control', 'experimental'], ['blue', 'red']):
+        bars = ax.bar(np.zeros(bins), np.zeros(bins), width=0, align='edge', alpha=0.7,
+                      color=color, label=group.capitalize(), animated=True)
+        line, = ax.plot([], [], color=color, linewidth=2, label='Normal fit', animated=True)
+        ax.set_title(f'{group.capitalize()} Group (n={len(groups[group])})', animated=True)
+        ax.set_xlabel('Pre-test Score')
+        ax.set_ylabel('Number of Students')
+        if len(groups[group]) > 0:
+            ax.set_xlim(all_scores.min() - 1, all_scores.max() + 1)
+            ax.set_ylim(0, 1.5 * np.histogram(groups[group], bins=bins)[0].max())
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        panels.append((ax, group, bars, line))
     
     plt.tight_layout()
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
     
-    if save_path:
-        plt.savefig(save_path / 'pre_test_distributions.png', dpi=300, bbox_inches='tight')
-        print(f"Saved: {save_path / 'pre_test_distributions.png'}")
+    def update(analysis_df):
+        """Redraw the data artists for a new dataset"""
+        groups = _prepare_clean_groups(analysis_df, 'pre_test_score')
+        fig.canvas.restore_region(background)
+        for ax, group, bars, line in panels:
+            data = groups[group].to_numpy(dtype=np.float64)
+            if len(data) > 0:
+                counts, edges = np.histogram(data, bins=bins)
+                for bar, left, width, height in zip(bars, edges[:-1], np.diff(edges), counts):
+                    bar.set_x(left)
+                    bar.set_width(width)
+                    bar.set_height(height)
+                x = np.linspace(data.min(), data.max(), 100)
+                _, _, pdf = _norm_fit_pdf(data, x)
+                line.set_data(x, pdf * len(data))
+            else:
+                # Clear the previous dataset's bars and fit so the panel shows n=0 honestly
+                for bar in bars:
+                    bar.set_height(0)
+                line.set_data([], [])
+            ax.title.set_text(f'{group.capitalize()} Group (n={len(data)})')
+            for artist in (*bars, line, ax.title):
+                ax.draw_artist(artist)
+        fig.canvas.blit(fig.bbox)
+        fig.canvas.flush_events()
     
-    plt.show()
+    update(analysis_df)
+    return fig, update
 
-def plot_post_test_comparison(analysis_df, save_path=None):
-    """Plot post-test score comparison between groups"""
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
-    
+def _plot_post(ax1, ax2, analysis_df):
+    """Draw the post-test histograms into ax1 and the group box plot into ax2"""
     # Clean data first
-    control_post = clean_data(analysis_df[analysis_df['group'] == 'control']['post_test_score'])
-    experimental_post = clean_data(analysis_df[analysis_df['group'] == 'experimental']['post_test_score'])
+    post_groups = _prepare_clean_groups(analysis_df, 'post_test_score')
+    control_post = post_groups['control']
+    experimental_post = post_groups['experimental']
     
     # Only plot if we have data
     if len(control_post) > 0 and len(experimental_post) > 0:
-        # Histograms
-        ax1.hist(control_post, bins=8, alpha=0.7, color='blue', label='Control', density=True)
-        ax1.hist(experimental_post, bins=8, alpha=0.7, color='red', label='Experimental', density=True)
+        # Histograms on shared bin edges so the two distributions line up
+        edges = np.histogram_bin_edges(np.concatenate([control_post, experimental_post]), bins=8)
+        widths = np.diff(edges)
+        control_counts, _ = np.histogram(control_post, bins=edges, density=True)
+        experimental_counts, _ = np.histogram(experimental_post, bins=edges, density=True)
+        ax1.bar(edges[:-1], control_counts, width=widths, align='edge', alpha=0.7, color='blue', label='Control')
+        ax1.bar(edges[:-1], experimental_counts, width=widths, align='edge', alpha=0.7, color='red', label='Experimental')
         ax1.set_xlabel('Post-test Score')
         ax1.set_ylabel('Density')
         ax1.set_title('Post-test Score Distributions')
         ax1.legend()
         ax1.grid(True, alpha=0.3)
         
-        # Box plot
-        plot_data = []
-        for group in ['control', 'experimental']:
-            group_data = clean_data(analysis_df[analysis_df['group'] == group]['post_test_score'])
-            for score in group_data:
-                plot_data.append({'Group': group.capitalize(), 'Score': score})
-        
-        plot_df = pd.DataFrame(plot_data)
+        # Box plot, built from the already-cleaned group scores
+        plot_df = pd.DataFrame({
+            'Group': np.repeat(['Control', 'Experimental'], [len(control_post), len(experimental_post)]),
+            'Score': np.concatenate([control_post.to_numpy(), experimental_post.to_numpy()]),
+        })
         sns.boxplot(data=plot_df, x='Group', y='Score', ax=ax2, palette=['blue', 'red'])
-        sns.stripplot(data=plot_df, x='Group', y='Score', ax=ax2, color='black', alpha=0.5, size=4)
+        _jitter_scatter(ax2, [control_post, experimental_post], size=4, alpha=0.5)
         ax2.set_title('Post-test Score Comparison')
         ax2.set_ylabel('Score')
         ax2.grid(True, alpha=0.3)
         
-        # Add significance annotation
-        control_mean = control_post.mean()
-        experimental_mean = experimental_post.mean()
-        ax2.text(0.5, max(plot_df['Score']) * 0.9, f'Control: {control_mean:.1f} ± {control_post.std():.1f}', 
+        # Add significance annotation (group mean/std from one grouped reduction)
+        post_stats = plot_df.groupby('Group', sort=False)['Score'].agg(['mean', 'std'])
+        y_top = plot_df['Score'].max() * 0.9
+        ax2.text(0.5, y_top, f"Control: {post_stats.loc['Control', 'mean']:.1f} ± {post_stats.loc['Control', 'std']:.1f}", 
                  ha='center', fontsize=10)
-        ax2.text(1.5, max(plot_df['Score']) * 0.9, f'Experimental: {experimental_mean:.1f} ± {experimental_post.std():.1f}', 
+        ax2.text(1.5, y_top, f"Experimental: {post_stats.loc['Experimental', 'mean']:.1f} ± {post_stats.loc['Experimental', 'std']:.1f}", 
                  ha='center', fontsize=10)
     else:
         ax1.text(0.5, 0.5, 'Insufficient data for plotting', ha='center', va='center', transform=ax1.transAxes)
         ax2.text(0.5, 0.5, 'Insufficient data for plotting', ha='center', va='center', transform=ax2.transAxes)
         ax1.set_title('Post-test Distributions')
         ax2.set_title('Post-test Comparison')
-    
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path / 'post_test_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"Saved: {save_path / 'post_test_comparison.png'}")
-    
-    plt.show()
 
-def plot_improvement_scores(analysis_df, save_path=None):
-    """Plot score improvements by group"""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Clean the data first
-    analysis_df_clean = analysis_df.copy()
-    analysis_df_clean['score_improvement'] = analysis_df_clean['score_improvement'].replace([np.inf, -np.inf], np.nan)
-    analysis_df_clean = analysis_df_clean.dropna(subset=['score_improvement'])
-    
+def plot_post_test_comparison(analysis_df, save_path=None, show=True, final=False):
+    """Plot post-test score comparison between groups"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    _plot_post(ax1, ax2, analysis_df)
+    _finish_figure(fig, save_path, 'post_test_comparison.png', show, final)
+
+def _plot_improve(ax, analysis_df):
+    """Draw the per-group improvement violin plot into ax"""
+    # Select finite improvements of both groups, taking only the needed columns
+    mask = (np.isfinite(analysis_df['score_improvement'].to_numpy(dtype=np.float64))
+            & analysis_df['group'].isin(['control', 'experimental']).to_numpy())
+
     # Prepare data for plotting
-    plot_data = []
-    for group in ['control', 'experimental']:
-        group_data = analysis_df_clean[analysis_df_clean['group'] == group]
-        for _, row in group_data.iterrows():
-            plot_data.append({
-                'Group': group.capitalize(),
-                'Improvement': row['score_improvement'],
-                'Student': row['student_id']
-            })
-    
-    plot_df = pd.DataFrame(plot_data)
+    plot_df = (analysis_df.loc[mask, ['group', 'score_improvement', 'student_id']]
+               .rename(columns={'group': 'Group', 'score_improvement': 'Improvement', 'student_id': 'Student'}))
+    plot_df['Group'] = plot_df['Group'].str.capitalize()
     
     if len(plot_df) > 0:
-        # Violin plot with swarm plot overlay
-        sns.violinplot(data=plot_df, x='Group', y='Improvement', 
+        # Violin plot with individual points overlaid
+        sns.violinplot(data=plot_df, x='Group', y='Improvement', order=['Control', 'Experimental'],
                        palette=['blue', 'red'], inner='quartile', ax=ax)
-        sns.swarmplot(data=plot_df, x='Group', y='Improvement', 
-                      color='black', alpha=0.6, size=3, ax=ax)
+        _jitter_scatter(ax, [plot_df.loc[plot_df['Group'] == group, 'Improvement']
+                             for group in ['Control', 'Experimental']], size=3, alpha=0.6)
         
         ax.set_ylabel('Score Improvement (Post - Pre)')
         ax.set_title('Learning Improvement by Instructional Method')
@@ -176,25 +270,35 @@ def plot_improvement_scores(analysis_df, save_path=None):
         ax.text(0.5, 0.5, 'No improvement data available', 
                 ha='center', va='center', transform=ax.transAxes, fontsize=12)
         ax.set_title('Learning Improvement by Instructional Method')
-    
-    plt.tight_layout()
-    
-    if save_path:
-        plt.savefig(save_path / 'improvement_scores.png', dpi=300, bbox_inches='tight')
-        print(f"Saved: {save_path / 'improvement_scores.png'}")
-    
-    plt.show()
+
+def plot_improvement_scores(analysis_df, save_path=None, show=True, final=False):
+    """Plot score improvements by group"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    _plot_improve(ax, analysis_df)
+    _finish_figure(fig, save_path, 'improvement_scores.png', show, final)
+
+def plot_all(analysis_df, save_path=None, show=True, final=False):
+    """Plot all paper panels into a single figure with one layout and save pass"""
+    fig, axd = plt.subplot_mosaic([['pre_c', 'pre_e'],
+                                   ['post_h', 'post_box'],
+                                   ['improve', 'improve']], figsize=(12, 16))
+    _plot_pre(axd['pre_c'], axd['pre_e'], analysis_df)
+    _plot_post(axd['post_h'], axd['post_box'], analysis_df)
+    _plot_improve(axd['improve'], analysis_df)
+    _finish_figure(fig, save_path, 'all_figures.png', show, final)
 
 def create_data_summary(analysis_df):
     """Create a summary of data quality"""
     print("=== DATA SUMMARY ===")
+    group_sizes = analysis_df['group'].value_counts()
+    pre_groups = _prepare_clean_groups(analysis_df, 'pre_test_score')
+    post_groups = _prepare_clean_groups(analysis_df, 'post_test_score')
     for group in ['control', 'experimental']:
-        group_data = analysis_df[analysis_df['group'] == group]
-        pre_scores = clean_data(group_data['pre_test_score'])
-        post_scores = clean_data(group_data['post_test_score'])
+        pre_scores = pre_groups[group]
+        post_scores = post_groups[group]
         
         print(f"\n{group.capitalize()} Group:")
-        print(f"  Total records: {len(group_data)}")
+        print(f"  Total records: {group_sizes.get(group, 0)}")
         print(f"  Valid pre-test scores: {len(pre_scores)}")
         print(f"  Valid post-test scores: {len(post_scores)}")
         if len(pre_scores) > 0:
@@ -203,11 +307,23 @@ def create_data_summary(analysis_df):
             print(f"  Post-test range: {post_scores.min():.1f} - {post_scores.max():.1f}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--show', action='store_true',
+                        help='display each figure interactively after saving it')
+    parser.add_argument('--final', action='store_true',
+                        help='save publication-quality figures at 300 dpi (default: 120 dpi drafts)')
+    parser.add_argument('--combined', action='store_true',
+                        help='render all panels into one figure (all_figures.png) instead of three files')
+    args = parser.parse_args()
+    
+    # Batch runs render straight to files with the non-interactive Agg backend
+    if not args.show:
+        plt.switch_backend('Agg')
+    
     setup_plotting()
     
     # Load data
-    data_dir = Path('../data/processed')
-    analysis_df = pd.read_csv(data_dir / 'analysis_ready.csv')
+    analysis_df = read_analysis_ready()
     
     # Create data summary
     create_data_summary(analysis_df)
@@ -217,8 +333,11 @@ if __name__ == "__main__":
     figures_dir.mkdir(exist_ok=True)
     
     # Generate all figures
-    plot_pre_test_distributions(analysis_df, figures_dir)
-    plot_post_test_comparison(analysis_df, figures_dir)
-    plot_improvement_scores(analysis_df, figures_dir)
+    if args.combined:
+        plot_all(analysis_df, figures_dir, show=args.show, final=args.final)
+    else:
+        plot_pre_test_distributions(analysis_df, figures_dir, show=args.show, final=args.final)
+        plot_post_test_comparison(analysis_df, figures_dir, show=args.show, final=args.final)
+        plot_improvement_scores(analysis_df, figures_dir, show=args.show, final=args.final)
     
     print("✅ All visualizations generated!")
@@ -1,16 +1,63 @@
 #!/usr/bin/env python3
+import argparse
 import pandas as pd
 import numpy as np
 import os
 from pathlib import Path
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Declared column types for the raw CSVs (parsed by the multithreaded Arrow reader);
+# group is categorical so group masks and groupbys compare integer codes
+_DTYPES = {'student_id': 'int32', 'total_score': 'float32', 'group': 'category'}
+
+def _save_processed(df, processed_dir, name, write_csv=False, **csv_kwargs):
+    """Write a processed table as zstd-compressed Parquet, plus a CSV copy if requested"""
+    df.to_parquet(processed_dir / f'{name}.parquet', compression='zstd', index=False)
+    print(f"   ✅ Created: {processed_dir}/{name}.parquet")
+    if write_csv:
+        df.to_csv(processed_dir / f'{name}.csv', index=False, **csv_kwargs)
+        print(f"   ✅ Created: {processed_dir}/{name}.csv")
+
+def _compute_loop(pre, post):
+    """Improvement, percentage improvement and finite-improvement mask in one fused loop"""
+    n = pre.size
+    imp = np.empty_like(pre)
+    pct = np.empty_like(pre)
+    valid = np.empty(n, np.bool_)
+    for i in prange(n):
+        p = pre[i]
+        d = post[i] - p
+        imp[i] = d
+        # Percentage improvement is undefined (NaN) for a pre-test score of zero
+        pct[i] = d / p * 100.0 if p > 0 else np.nan
+        valid[i] = np.isfinite(d)
+    return imp, pct, valid
+
+def _compute_numpy(pre, post):
+    """Vectorized equivalent of _compute_loop for when numba is not installed"""
+    imp = post - pre
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(pre > 0, imp / pre * 100.0, np.nan).astype(pre.dtype)
+    return imp, pct, np.isfinite(imp)
+
+# numba is optional: compile the fused kernel when it is available
+_compute = njit(parallel=True, cache=True)(_compute_loop) if njit is not None else _compute_numpy
+
+def _n_missing(df):
+    """Count missing cells over the whole frame in one array reduction"""
+    return int(pd.isna(df.to_numpy()).sum())
+
 def validate_datasets():
     """Validate the anonymized datasets"""
     
     # Load datasets with proper paths
-    pre_test = pd.read_csv('raw/pre_test_scores.csv')
-    post_control = pd.read_csv('raw/post_test_control.csv')
-    post_experimental = pd.read_csv('raw/post_test_experimental.csv')
+    pre_test = pd.read_csv('raw/pre_test_scores.csv', engine='pyarrow', dtype=_DTYPES)
+    post_control = pd.read_csv('raw/post_test_control.csv', engine='pyarrow', dtype=_DTYPES)
+    post_experimental = pd.read_csv('raw/post_test_experimental.csv', engine='pyarrow', dtype=_DTYPES)
     
     print("=== DATA VALIDATION REPORT ===")
     
@@ -33,107 +80,114 @@ def validate_datasets():
     
     # Check for missing values
     print(f"\n4. Missing Values:")
-    print(f"   Pre-test: {pre_test.isnull().sum().sum()} missing values")
-    print(f"   Control post: {post_control.isnull().sum().sum()} missing values")
-    print(f"   Experimental post: {post_experimental.isnull().sum().sum()} missing values")
+    print(f"   Pre-test: {_n_missing(pre_test)} missing values")
+    print(f"   Control post: {_n_missing(post_control)} missing values")
+    print(f"   Experimental post: {_n_missing(post_experimental)} missing values")
     
     print(f"\n✅ All datasets validated successfully!")
     return pre_test, post_control, post_experimental
 
-def create_processed_files():
-    """Create processed datasets for analysis"""
+def create_processed_files(pre_test=None, post_control=None, post_experimental=None, write_csv=False):
+    """Create processed datasets for analysis, reusing already-loaded raw data if given"""
     
     print("\n=== CREATING PROCESSED DATASETS ===")
     
-    # Load raw data
-    pre_test = pd.read_csv('raw/pre_test_scores.csv')
-    post_control = pd.read_csv('raw/post_test_control.csv')
-    post_experimental = pd.read_csv('raw/post_test_experimental.csv')
+    # Load raw data not passed in by the caller
+    if pre_test is None:
+        pre_test = pd.read_csv('raw/pre_test_scores.csv', engine='pyarrow', dtype=_DTYPES)
+    if post_control is None:
+        post_control = pd.read_csv('raw/post_test_control.csv', engine='pyarrow', dtype=_DTYPES)
+    if post_experimental is None:
+        post_experimental = pd.read_csv('raw/post_test_experimental.csv', engine='pyarrow', dtype=_DTYPES)
     
     # Create processed directory if it doesn't exist
     processed_dir = Path('processed')
     processed_dir.mkdir(exist_ok=True)
     
-    # 1. Create combined_scores.csv (pre + post scores together)
-    print("1. Creating combined_scores.csv...")
-    
-    # Add group info to post-test data
-    post_control['group'] = 'control'
-    post_experimental['group'] = 'experimental'
-    
-    # Combine all post-test data
-    post_combined = pd.concat([post_control, post_experimental], ignore_index=True)
+    # 1. Create combined_scores (pre + post scores together)
+    print("1. Creating combined_scores...")
     
-    # Merge pre and post scores
-    combined_scores = pd.merge(
-        pre_test[['student_id', 'total_score', 'group']].rename(columns={'total_score': 'pre_test_score'}),
-        post_combined[['student_id', 'total_score']].rename(columns={'total_score': 'post_test_score'}),
-        on='student_id',
-        how='left'
-    )
+    # Look up each student's post-test score by id (post-test ids are unique
+    # across both groups) instead of merging the full frames
+    post_cols = ['student_id', 'total_score']
+    post_lookup = pd.concat([post_control[post_cols], post_experimental[post_cols]]).set_index('student_id')['total_score']
+    combined_scores = (pre_test[['student_id', 'total_score', 'group']]
+                       .rename(columns={'total_score': 'pre_test_score'})
+                       .astype({'group': 'category'}))
+    combined_scores['post_test_score'] = combined_scores['student_id'].map(post_lookup)
     
-    # Calculate score improvement
-    combined_scores['score_improvement'] = combined_scores['post_test_score'] - combined_scores['pre_test_score']
-    combined_scores['improvement_percentage'] = (combined_scores['score_improvement'] / combined_scores['pre_test_score'].replace(0, 0.1)) * 100
+    # Calculate score improvement and percentage improvement in one pass
+    improvement, percentage, valid = _compute(combined_scores['pre_test_score'].to_numpy(dtype=np.float32),
+                                              combined_scores['post_test_score'].to_numpy(dtype=np.float32))
+    combined_scores['score_improvement'] = improvement
+    combined_scores['improvement_percentage'] = percentage
     
-    combined_scores.to_csv(processed_dir / 'combined_scores.csv', index=False)
-    print(f"   ✅ Created: {processed_dir}/combined_scores.csv")
-    print(f"   Records: {len(combined_scores)}")
+    _save_processed(combined_scores, processed_dir, 'combined_scores', write_csv, float_format='%.4f')
+    print(f"   Records: {len(combined_scores)} ({valid.sum()} with a valid improvement)")
     
-    # 2. Create analysis_ready.csv (minimal columns for statistical analysis)
-    print("2. Creating analysis_ready.csv...")
+    # 2. Create analysis_ready (minimal columns for statistical analysis)
+    print("2. Creating analysis_ready...")
     
     analysis_ready = combined_scores[['student_id', 'group', 'pre_test_score', 'post_test_score', 'score_improvement']].copy()
     
     # Add some basic analytics
-    analysis_summary = analysis_ready.groupby('group').agg({
+    analysis_summary = analysis_ready.groupby('group', observed=True).agg({
         'pre_test_score': ['mean', 'std', 'count'],
         'post_test_score': ['mean', 'std'],
         'score_improvement': ['mean', 'std']
     }).round(2)
     
-    analysis_ready.to_csv(processed_dir / 'analysis_ready.csv', index=False)
-    print(f"   ✅ Created: {processed_dir}/analysis_ready.csv")
+    _save_processed(analysis_ready, processed_dir, 'analysis_ready', write_csv)
     
     # 3. Create summary statistics file
     print("3. Creating summary statistics...")
     
+    # Reduce the float32 scores at float64 so the published summary keeps full precision
+    pre_scores = pre_test['total_score'].astype('float64')
+    control_scores = post_control['total_score'].astype('float64')
+    experimental_scores = post_experimental['total_score'].astype('float64')
+    
     summary_stats = {
         'dataset': ['Pre-test', 'Post-test Control', 'Post-test Experimental'],
         'n_students': [len(pre_test), len(post_control), len(post_experimental)],
         'mean_score': [
-            pre_test['total_score'].mean(),
-            post_control['total_score'].mean(), 
-            post_experimental['total_score'].mean()
+            pre_scores.mean(),
+            control_scores.mean(), 
+            experimental_scores.mean()
         ],
         'std_dev': [
-            pre_test['total_score'].std(),
-            post_control['total_score'].std(),
-            post_experimental['total_score'].std()
+            pre_scores.std(),
+            control_scores.std(),
+            experimental_scores.std()
         ]
     }
     
     summary_df = pd.DataFrame(summary_stats)
-    summary_df.to_csv(processed_dir / 'summary_statistics.csv', index=False)
-    print(f"   ✅ Created: {processed_dir}/summary_statistics.csv")
+    _save_processed(summary_df, processed_dir, 'summary_statistics', write_csv)
     
     # Print quick summary
     print(f"\n📊 QUICK SUMMARY:")
-    print(f"   Pre-test mean: {pre_test['total_score'].mean():.2f} ± {pre_test['total_score'].std():.2f}")
-    print(f"   Control post mean: {post_control['total_score'].mean():.2f} ± {post_control['total_score'].std():.2f}")
-    print(f"   Experimental post mean: {post_experimental['total_score'].mean():.2f} ± {post_experimental['total_score'].std():.2f}")
+    print(f"   Pre-test mean: {pre_scores.mean():.2f} ± {pre_scores.std():.2f}")
+    print(f"   Control post mean: {control_scores.mean():.2f} ± {control_scores.std():.2f}")
+    print(f"   Experimental post mean: {experimental_scores.mean():.2f} ± {experimental_scores.std():.2f}")
     
     return combined_scores, analysis_ready
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate raw data and create processed datasets")
+    parser.add_argument('--csv', action='store_true',
+                        help='also write CSV copies of the processed files for external tools')
+    args = parser.parse_args()
+    
     # Run validation
     pre_test, post_control, post_experimental = validate_datasets()
     
     # Create processed files
-    combined_scores, analysis_ready = create_processed_files()
+    combined_scores, analysis_ready = create_processed_files(pre_test, post_control, post_experimental,
+                                                             write_csv=args.csv)
     
     print(f"\n🎉 All processed files created successfully!")
     print(f"   Check the 'processed/' folder for:")
-    print(f"   - combined_scores.csv")
-    print(f"   - analysis_ready.csv") 
-    print(f"   - summary_statistics.csv")
\ No newline at end of file
+    print(f"   - combined_scores.parquet")
+    print(f"   - analysis_ready.parquet") 
+    print(f"   - summary_statistics.parquet")
\ No newline at end of file